@@ -1,8 +1,15 @@
+import functools
+import hashlib
+import math
 import os
-import json
-from typing import Dict, Any, List
+import sys
+from collections import defaultdict
+from typing import Dict, Any, List, Tuple
 from pathlib import Path
+import diskcache
+import orjson
 import requests
+from requests.adapters import HTTPAdapter, Retry
 import pandas as pd
 import streamlit as st
 import base64
@@ -14,34 +21,48 @@ API_KEY  = st.secrets.get("API_KEY",  os.environ.get("API_KEY",  ""))  # optiona
 HEADERS  = {"Content-Type": "application/json", **({"X-API-Key": API_KEY} if API_KEY else {})}
 # --------------------------------------------
 
-# Globals populated from schema["lists"]["countyTownships"]
-COUNTY_OPTIONS: List[str] = []
-TOWNSHIPS_BY_COUNTY: Dict[str, List[str]] = {}
+# One keep-alive session for all API calls: connection reuse skips the
+# TCP/TLS handshake that otherwise dominates each schema fetch and
+# Calculate click against a remote API_BASE.
+_SESSION = requests.Session()
+_SESSION.headers.update(HEADERS)
+_adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8,
+                       max_retries=Retry(total=2, backoff_factor=0.3))
+_SESSION.mount("https://", _adapter)
+_SESSION.mount("http://", _adapter)
 
-def _init_county_lists_from_schema(schema: Dict[str, Any]) -> None:
-    """Build COUNTY_OPTIONS and TOWNSHIPS_BY_COUNTY from schema['lists']['countyTownships']."""
-    global COUNTY_OPTIONS, TOWNSHIPS_BY_COUNTY
-    COUNTY_OPTIONS = []
-    TOWNSHIPS_BY_COUNTY = {}
+# Disk-backed schema cache so cold starts (new worker, app restart) don't
+# re-download and re-parse the schema when the API hasn't changed.
+_SCHEMA_CACHE = diskcache.Cache(str(Path(__file__).parent / ".cache"))
 
-    lists = schema.get("lists") or {}
-    pairs = lists.get("countyTownships") or []
+@st.cache_data(show_spinner=False)
+def _county_maps(schema_token: str, _schema_lists: Dict[str, Any]) -> Tuple[Tuple[str, ...], Dict[str, Tuple[str, ...]]]:
+    """Build (counties, townships_by_county) from lists['countyTownships'] in one pass.
+
+    Returns sorted tuples so the result is immutable and safe to share across
+    reruns. Keyed on the schema content token; the dict itself is unhashed.
+    """
+    pairs = (_schema_lists or {}).get("countyTownships") or []
     if not isinstance(pairs, list):
-        return
+        return (), {}
 
-    # Build sets, then sort for stable UI
-    counties_set = set()
-    mapping = {}
+    mapping: Dict[str, set] = defaultdict(set)
     for r in pairs:
-        c = str((r.get("county") or "")).strip()
-        t = str((r.get("township") or "")).strip()
+        # values come straight from JSON, so they're already str (or missing);
+        # skip the defensive str()/or-"" casts that allocated per pair
+        c = r.get("county")
+        t = r.get("township")
         if not c or not t:
             continue
-        counties_set.add(c)
-        mapping.setdefault(c, set()).add(t)
+        c = c.strip()
+        t = t.strip()
+        if not c or not t:
+            continue
+        mapping[c].add(t)
 
-    COUNTY_OPTIONS = sorted(counties_set)
-    TOWNSHIPS_BY_COUNTY = {c: sorted(ts) for c, ts in mapping.items()}
+    counties = tuple(sorted(mapping))
+    townships_by_county = {c: tuple(sorted(ts)) for c, ts in mapping.items()}
+    return counties, townships_by_county
 
 def _is_array_like(val: Any) -> bool:
     """Detect common array/table shapes returned by the engine."""
@@ -71,7 +92,8 @@ def _as_array_df(val: Any):
 
         if rows is not None and cols is not None:
             try:
-                return pd.DataFrame(rows, columns=cols), list(cols)
+                # from_records has the fast path for list-of-row sequences
+                return pd.DataFrame.from_records(rows, columns=cols), list(cols)
             except Exception:
                 # Fallback: try to coerce whatever we have
                 try:
@@ -114,10 +136,19 @@ def _display_name(cid: str, schema: Dict[str, Any]) -> str:
     pretty = " ".join(parts)
     return pretty[:1].upper() + pretty[1:]
 
-def logo_img_tag(width=220) -> str:
+# cached: reading + base64-encoding the JPEG once per process, shared across
+# sessions, instead of hitting disk on every rerun
+@st.cache_resource(show_spinner=False)
+def _logo_b64() -> str | None:
     logo_path = Path(__file__).parent / "assets" / "5lakes_logo.jpg"
     if logo_path.exists():
-        b64 = base64.b64encode(logo_path.read_bytes()).decode("utf-8")
+        return base64.b64encode(logo_path.read_bytes()).decode("utf-8")
+    return None
+
+
+def logo_img_tag(width=220) -> str:
+    b64 = _logo_b64()
+    if b64 is not None:
         return f"<img src='data:image/jpeg;base64,{b64}' alt='5 Lakes Energy Logo' style='width:{width}px; border-radius:5px;'>"
     # fallback placeholder
     return f"<div style='width:{width}px;height:{int(width*0.45)}px;background:#eee;color:#666;display:flex;align-items:center;justify-content:center;border-radius:5px;'>Logo</div>"
@@ -242,11 +273,35 @@ def apply_custom_style():
 st.set_page_config(page_title="R-STEP Calculator", layout="wide")
 apply_custom_style()
 
-@st.cache_data(show_spinner=False)
-def load_schema() -> Dict[str, Any]:
-    r = requests.get(f"{API_BASE}/schema", timeout=30)
+def _fetch_schema() -> Tuple[str, Dict[str, Any]]:
+    """Fetch /schema with a conditional GET backed by the on-disk cache.
+
+    Returns (token, parsed_schema) where token identifies the schema content
+    (ETag when the server sends one, else a content hash). The cache stores
+    (etag, token, parsed_schema) keyed by API_BASE; a 304 response lets us
+    skip the body transfer and the JSON parse entirely.
+    """
+    cached = _SCHEMA_CACHE.get(API_BASE)
+    if cached is not None and len(cached) != 3:  # pre-token cache entry
+        cached = None
+    req_headers = {}
+    if cached and cached[0]:
+        req_headers["If-None-Match"] = cached[0]
+    r = _SESSION.get(f"{API_BASE}/schema", headers=req_headers, timeout=30)
+    if r.status_code == 304 and cached:
+        return cached[1], cached[2]
     r.raise_for_status()
-    return r.json()
+    schema = orjson.loads(r.content)
+    etag = r.headers.get("ETag", "")
+    token = etag or hashlib.blake2b(r.content, digest_size=16).hexdigest()
+    _SCHEMA_CACHE.set(API_BASE, (etag, token, schema))
+    return token, schema
+
+# cache_resource (not cache_data) so every rerun sees the same objects: the
+# schema is treated as read-only, and derived caches key off the content token.
+@st.cache_resource(show_spinner=False, ttl=3600)
+def load_schema() -> Tuple[str, Dict[str, Any]]:
+    return _fetch_schema()
 
 def _to_float(x):
     if x is None or x == "":
@@ -256,9 +311,6 @@ def _to_float(x):
     except Exception:
         return None
 
-def _stringify_options(ev):
-    return [str(o) for o in (ev or [])]
-
 def _get_help(row):
     raw = (
         row.get("HelpText")
@@ -273,6 +325,25 @@ def _get_help(row):
         raw = raw.strip()
     return raw or None
 
+# cache_resource keyed by the schema content token: the walk runs once per
+# schema version and annotates the shared row dicts in place.
+@st.cache_resource(show_spinner=False)
+def _normalize_input_rows(schema_token: str, _schema) -> bool:
+    """Normalize every input row once: resolved help text ('_help'), the
+    lowercased type ('_type'), and pre-stringified enum options ('_enum'),
+    so render_field does no per-rerun fallback chains or list rebuilding."""
+    def _norm(rows):
+        for r in rows:
+            r["_help"] = _get_help(r)
+            r["_type"] = (r.get("Type") or "string").lower()
+            ev = r.get("EnumValues")
+            r["_enum"] = [str(o) for o in ev] if isinstance(ev, list) and ev else None
+
+    _norm(_schema.get("globals", {}).get("inputs", []))
+    for c in _schema.get("calculators", []):
+        _norm(c.get("inputs") or [])
+    return True
+
 def _selectbox_with_placeholder(label: str, options: List[str], key: str, helptext: str | None, current_value: Any):
     """
     Utility: add '— select —' placeholder and compute index from current_value.
@@ -286,53 +357,95 @@ def _selectbox_with_placeholder(label: str, options: List[str], key: str, helpte
         idx = 0
     return st.selectbox(label, options=opts, index=idx, key=key, help=helptext)
 
-def render_field(row, key_prefix: str, current_value):
-    """Show Description as label, but use Name as key."""
-    t = (row.get("Type") or "string").lower()
+# Cap on options shipped to the frontend per dropdown; big lists (Michigan has
+# ~1,800 townships) make the selectbox payload and relayout cost balloon.
+_SEARCH_LIMIT = 50
+
+@st.cache_data(show_spinner=False)
+def _casefold_index(options: Tuple[str, ...]) -> Tuple[str, ...]:
+    """Casefold every option once per distinct option tuple; reused by the
+    search filter so keystrokes don't re-lowercase the whole list."""
+    return tuple(o.casefold() for o in options)
+
+def _searchable_selectbox(label: str, options, key: str, helptext: str | None,
+                          current_value: Any, limit: int = _SEARCH_LIMIT):
+    """Selectbox guarded by a text filter: only the top `limit` matches are
+    rendered, so the frontend never receives the full option list."""
+    opts = tuple(options)
+    if len(opts) > limit:
+        q = (st.text_input(f"{label} — search", key=f"{key}:q",
+                           placeholder="Type to filter the list…") or "").strip().casefold()
+        if q:
+            opts_cf = _casefold_index(opts)
+            trimmed = [opts[i] for i, o in enumerate(opts_cf) if q in o][:limit]
+        else:
+            trimmed = list(opts[:limit])
+        cur = "" if current_value is None else str(current_value)
+        if cur and cur != "— select —" and cur not in trimmed:
+            trimmed.insert(0, cur)  # keep the active selection visible
+        opts = trimmed
+    else:
+        opts = list(opts)
+    return _selectbox_with_placeholder(label, opts, key, helptext, current_value)
+
+@functools.lru_cache(maxsize=1024)
+def _field_label(label_text: str, required: bool) -> str:
+    return f"{label_text}{' *' if required else ''}"
+
+
+def render_field(row, key_prefix: str, current_value, county_maps=None, widget_key=None):
+    """Show Description as label, but use Name as key.
+
+    Widgets render inside the inputs form, so values are read back from the
+    return value at submit time; forms do not allow per-widget callbacks.
+    """
+    counties, townships_by_county = county_maps or ((), {})
+    t = row.get("_type", "string")
     name_key = row["Name"]
-    widget_key = f"{key_prefix}:{name_key}"
+    if widget_key is None:
+        widget_key = f"{key_prefix}:{name_key}"
     label_text = (row.get("Description") or name_key).strip()
-    label = f"{label_text}{' *' if row.get('Required') else ''}"
-    helptext = _get_help(row)
-    ev = row.get("EnumValues")
+    label = _field_label(label_text, bool(row.get("Required")))
+    helptext = row.get("_help")
+    ev = row.get("_enum")
 
     # If something odd got into the state for this key, clean it up
     if widget_key in st.session_state and isinstance(st.session_state[widget_key], (dict, list)):
         del st.session_state[widget_key]
 
     # ---- SPECIAL CASES: county/township (use schema lists, ignore EnumValues) ----
-    if name_key == "county" and COUNTY_OPTIONS:
+    if name_key == "county" and counties:
         # county select (no default)
-        return _selectbox_with_placeholder(
+        return _searchable_selectbox(
             label=label,
-            options=COUNTY_OPTIONS,
-            key=f"{key_prefix}:{name_key}",
+            options=counties,
+            key=widget_key,
             helptext=helptext,
-            current_value=st.session_state.get(f"{key_prefix}:{name_key}")
+            current_value=st.session_state.get(widget_key),
         )
 
-    if name_key == "township" and TOWNSHIPS_BY_COUNTY:
+    if name_key == "township" and townships_by_county:
         # townships filtered by the currently selected county (global scope)
         selected_county = st.session_state.get("global:county")
-        towns = TOWNSHIPS_BY_COUNTY.get(selected_county, [])
+        towns = townships_by_county.get(selected_county, ())
         # If current township is invalid for this county, clear it
-        cur_key = f"{key_prefix}:{name_key}"
+        cur_key = widget_key
         cur_val = st.session_state.get(cur_key)
         if cur_val and str(cur_val) not in towns:
             st.session_state[cur_key] = ""
             cur_val = ""
-        return _selectbox_with_placeholder(
+        return _searchable_selectbox(
             label=label,
             options=towns,
             key=cur_key,
             helptext=helptext,
-            current_value=cur_val
+            current_value=cur_val,
         )
 
     # ---- DEFAULT CASES (existing behavior) ----
-    # dropdown (generic EnumValues)
-    if isinstance(ev, list) and len(ev) > 0:
-        options = _stringify_options(ev)
+    # dropdown (generic EnumValues, pre-stringified by _normalize_input_rows)
+    if ev:
+        options = ev
         cur = "" if current_value is None else str(current_value)
         try:
             idx = options.index(cur)
@@ -340,7 +453,7 @@ def render_field(row, key_prefix: str, current_value):
             idx = 0
         return st.selectbox(
             label, options=options, index=idx if 0 <= idx < len(options) else 0,
-            key=f"{key_prefix}:{name_key}", help=helptext,
+            key=widget_key, help=helptext,
         )
 
     # numbers
@@ -354,26 +467,34 @@ def render_field(row, key_prefix: str, current_value):
         return st.number_input(
             label, value=float(val), step=float(step),
             min_value=minv, max_value=maxv,
-            key=f"{key_prefix}:{name_key}", help=helptext,
+            key=widget_key, help=helptext,
         )
 
     # strings
     val = "" if current_value is None else str(current_value)
-    return st.text_input(label, value=val, key=f"{key_prefix}:{name_key}", help=helptext)
+    return st.text_input(label, value=val, key=widget_key, help=helptext)
+
+# Result tables repeat values heavily (zeros, year counts, flat rates); an
+# lru_cache turns most of those formats into a dict hit.
+@functools.lru_cache(maxsize=4096)
+def _fmt_float(v: float) -> str:
+    if not math.isfinite(v):  # NaN/inf: render blank like None (round() would raise)
+        return ""
+    if abs(v) < 1:
+        return f"{v:,.2f}"
+    r = round(v)
+    if abs(v - r) < 1e-9:
+        return f"{r:,d}"
+    return f"{v:,.2f}"
 
-def _coerce_float(x):
-    """Return float(x) if x is a number or a numeric-looking string (handles commas)."""
-    if isinstance(x, (int, float)):
-        return float(x)
-    if isinstance(x, str):
-        s = x.strip().replace(",", "")
-        if s == "":
-            return None
-        try:
-            return float(s)
-        except ValueError:
-            return None
-    return None
+# Exact-type dispatch: the common cell types resolve with one dict lookup
+# instead of the old coerce-and-catch path (exceptions are ~100x a type check).
+_FMT_DISPATCH = {
+    int: lambda x: _fmt_float(float(x)),
+    float: _fmt_float,
+    bool: lambda x: _fmt_float(float(x)),
+    type(None): lambda _: "",
+}
 
 def format_number(x):
     """
@@ -381,30 +502,96 @@ def format_number(x):
     - |x| >= 1     -> integer if whole, else 2 decimals
     - blank/non-numeric -> pass through ('' for None/"")
     """
-    v = _coerce_float(x)
-    if v is None:
-        return "" if x in (None, "") else x
-
-    if abs(v) < 1:
-        return f"{v:,.2f}"
-
-    if abs(v - round(v)) < 1e-9:
-        return f"{round(v):,d}"
-
-    return f"{v:,.2f}"
+    fn = _FMT_DISPATCH.get(type(x))
+    if fn is not None:
+        return fn(x)
+    if isinstance(x, str):
+        s = x.strip().replace(",", "")
+        if s == "":
+            return ""
+        try:
+            return _fmt_float(float(s))
+        except ValueError:
+            return x
+    if isinstance(x, (int, float)):  # numpy scalars subclass int/float
+        return _fmt_float(float(x))
+    return x
 
-def build_label_map(schema) -> Dict[str, Dict[str, str]]:
-    mapping: Dict[str, Dict[str, str]] = {}
-    for c in schema.get("calculators", []):
-        by_name = {}
+# st.cache_data hashes the DataFrame with pandas' C-level hasher, which is far
+# cheaper than re-running to_csv on every rerun while results are unchanged.
+@st.cache_data(show_spinner=False)
+def _csv_bytes(df: pd.DataFrame) -> bytes:
+    return df.to_csv(index=False).encode("utf-8")
+
+def _format_numeric(nums: pd.Series) -> pd.Series:
+    """Apply format_number's rules to an all-numeric Series via masks."""
+    if nums.dtype == bool:  # pd.to_numeric keeps bool dtype; the mask subtraction below rejects it
+        nums = nums.astype("int64")
+    formatted = nums.map("{:,.2f}".format)
+    nonfinite = (nums - nums) != 0  # True for ±inf (NaN never reaches here)
+    if nonfinite.any():
+        formatted.loc[nonfinite] = ""
+    int_mask = (nums.abs() >= 1) & ((nums - nums.round()).abs() < 1e-9) & ~nonfinite
+    # astype('int64') silently wraps for |v| >= 2**63; format those few via
+    # Python's arbitrary-precision ints like the scalar path does.
+    big = int_mask & (nums.abs() >= 2**63)
+    if big.any():
+        formatted.loc[big] = nums[big].map(format_number)
+        int_mask &= ~big
+    if int_mask.any():
+        formatted.loc[int_mask] = nums[int_mask].round().astype("int64").map("{:,d}".format)
+    return formatted
+
+def _format_series(s: pd.Series) -> pd.Series:
+    """Vectorized equivalent of s.map(format_number): coerce once with
+    pd.to_numeric and format the numeric cells via masks; only the cells that
+    don't coerce fall back to the per-value formatter."""
+    nums = pd.to_numeric(s, errors="coerce")
+    mask = nums.notna()
+    if mask.all():
+        return _format_numeric(nums)
+    out = s.astype(object).copy()
+    out[~mask] = s[~mask].map(format_number)
+    if mask.any():
+        out[mask] = _format_numeric(nums[mask])
+    return out
+
+def _format_df(df: pd.DataFrame) -> pd.DataFrame:
+    return pd.DataFrame({col: _format_series(df[col]) for col in df.columns}, index=df.index)
+
+def _show_table(df: pd.DataFrame) -> None:
+    """Render a result table through the vectorized string formatter.
+
+    NumberColumn on the pinned streamlit==1.39.0 only takes printf-style
+    format strings (the 'localized' keyword is a later-Streamlit feature),
+    and no single printf directive reproduces format_number's whole-number
+    vs. two-decimal rules, so formatting stays in Python."""
+    st.dataframe(_format_df(df), use_container_width=True)
+
+# cache_resource so the rows stay the same objects as the schema's (no
+# per-call copy); read-only by convention like the schema itself.
+@st.cache_resource(show_spinner=False)
+def _calc_index(schema_token: str, _schema) -> Tuple[frozenset, Dict[str, Dict[str, Any]]]:
+    """One walk over the schema: the global input names plus, per calculator,
+    its non-global input rows, their interned widget keys, and its output
+    label map. Render, payload build, reset, and the results renderer all
+    read from this one struct instead of re-walking the calculators."""
+    global_names = frozenset(r["Name"] for r in _schema.get("globals", {}).get("inputs", []))
+    index: Dict[str, Dict[str, Any]] = {}
+    for c in _schema.get("calculators", []):
+        cid = c["id"]
+        rows = [r for r in (c.get("inputs") or []) if r["Name"] not in global_names]
+        labels = {}
         for r in c.get("outputs", []):
             nm = (r.get("Name") or "").strip()
-            if not nm:
-                continue
-            lbl = (r.get("Label") or "").strip() or nm
-            by_name[nm] = lbl
-        mapping[c["id"]] = by_name
-    return mapping
+            if nm:
+                labels[nm] = (r.get("Label") or "").strip() or nm
+        index[cid] = {
+            "rows": rows,
+            "keys": [sys.intern(f"calc:{cid}:{r['Name']}") for r in rows],
+            "labels": labels,
+        }
+    return global_names, index
 
 def _normalize_default_for_row(row: Dict[str, Any], schema_lists: Dict[str, Any]) -> Any:
     t = (row.get("Type") or "string").lower()
@@ -460,32 +647,19 @@ def main():
     )
 
     try:
-        schema = load_schema()
+        schema_token, schema = load_schema()
     except Exception as e:
         st.error(f"Failed to load schema from {API_BASE}: {e}")
         st.stop()
 
-    # Initialize county/township lists from schema
-    _init_county_lists_from_schema(schema)
-
+    _normalize_input_rows(schema_token, schema)
     calculators: List[Dict[str, Any]] = schema.get("calculators", [])
     globals_rows: List[Dict[str, Any]] = schema.get("globals", {}).get("inputs", [])
-    global_names = {r["Name"] for r in globals_rows}
-    label_map = build_label_map(schema)
-
-    # Build county -> [township] map from schema.lists
-    ct_pairs = (schema.get("lists", {}) or {}).get("countyTownships", []) or []
-    county_to_townships = {}
-    for p in ct_pairs:
-        c = str(p.get("county", "")).strip()
-        t = str(p.get("township", "")).strip()
-        if c and t:
-            county_to_townships.setdefault(c, []).append(t)
-    
-    # Sort for nice UI
-    for k in county_to_townships:
-        county_to_townships[k] = sorted(set(county_to_townships[k]))
-    all_counties = sorted(county_to_townships.keys())
+    global_names, calc_index = _calc_index(schema_token, schema)
+
+    # County -> townships map, built once per schema version (cached)
+    all_counties, county_to_townships = _county_maps(schema_token, schema.get("lists") or {})
+    county_maps = (all_counties, county_to_townships)
 
 
     with st.sidebar:
@@ -497,6 +671,7 @@ def main():
             default=all_ids,
             format_func=lambda cid: _display_name(cid, schema)
         )
+        selected_set = set(selected)  # O(1) membership for the render loops
         st.divider()
         st.subheader("Instructions")
         st.write("Select which modules you'd like to use in the dropdown above.")
@@ -513,142 +688,156 @@ def main():
     with left:
         # --- Globals ---
         st.header("Global Inputs")
-        gcols = st.columns(2)
         globals_vals: Dict[str, Any] = {}
-        
-        # Pull current session values (if any) to keep continuity
-        current_county = st.session_state.get("global:county", "— select —")
-        current_township = st.session_state.get("global:township", "— select —")
-        
-        for i, row in enumerate(globals_rows):
+
+        # County/township stay OUTSIDE the form below: the township list
+        # cascades from the chosen county, which needs a rerun on selection.
+        # Everything else is batched in a form so typing doesn't rerun the app.
+        location_rows = [r for r in globals_rows if r.get("Name") in ("county", "township")]
+        other_global_rows = [r for r in globals_rows if r.get("Name") not in ("county", "township")]
+
+        gcols = st.columns(2)
+        for i, row in enumerate(location_rows):
             name = row.get("Name")
             with gcols[i % 2]:
                 if name == "county":
                     # County select with sanitize-before-render
-                    options = ["— select —"] + all_counties
-        
                     cur_key = "global:county"
                     cur_val = st.session_state.get(cur_key, "— select —")
-                    if cur_val not in options:
+                    if cur_val != "— select —" and cur_val not in all_counties:
                         st.session_state[cur_key] = "— select —"
                         cur_val = "— select —"
-        
-                    idx = options.index(cur_val)
-        
-                    sel = st.selectbox(
+
+                    sel = _searchable_selectbox(
                         (row.get("Description") or "county"),
-                        options=options,
-                        index=idx,
+                        all_counties,
                         key=cur_key,
-                        help=_get_help(row),
+                        helptext=row.get("_help"),
+                        current_value=cur_val,
                     )
-        
+
                     # Normalize for payload (empty string if placeholder chosen)
                     globals_vals["county"] = "" if sel == "— select —" else sel
         
                     # If county changed and current township no longer valid, push township to placeholder
                     current_township = st.session_state.get("global:township", "— select —")
                     if globals_vals["county"]:
-                        valid_towns = county_to_townships.get(globals_vals["county"], [])
-                        if current_township not in (["— select —"] + valid_towns):
+                        valid_towns = county_to_townships.get(globals_vals["county"], ())
+                        if current_township != "— select —" and current_township not in valid_towns:
                             st.session_state["global:township"] = "— select —"
         
                 elif name == "township":
                     # Township options depend on selected county (after county sanitize)
                     c = st.session_state.get("global:county", "— select —")
                     selected_county = "" if c == "— select —" else c
-                    t_options = county_to_townships.get(selected_county, []) if selected_county else []
+                    t_options = list(county_to_townships.get(selected_county, ())) if selected_county else []
         
-                    # Fallback to EnumValues if mapping is empty (optional)
+                    # Fallback to EnumValues if mapping is empty (optional); this
+                    # is the statewide ~1,800-entry list, so the search limiter
+                    # below matters most here.
                     if not t_options:
                         for r_ in globals_rows:
                             if r_.get("Name") == "township" and isinstance(r_.get("EnumValues"), list):
                                 t_options = sorted(str(x).strip() for x in r_["EnumValues"] if str(x).strip())
                                 break
-        
-                    options = ["— select —"] + t_options
-        
+
                     # Sanitize township BEFORE rendering
                     cur_key = "global:township"
                     cur_val = st.session_state.get(cur_key, "— select —")
-                    if cur_val not in options:
+                    if cur_val != "— select —" and cur_val not in t_options:
                         st.session_state[cur_key] = "— select —"
                         cur_val = "— select —"
-        
-                    idx = options.index(cur_val)
-        
-                    sel = st.selectbox(
+
+                    sel = _searchable_selectbox(
                         (row.get("Description") or "township"),
-                        options=options,
-                        index=idx,
+                        t_options,
                         key=cur_key,
-                        help=_get_help(row),
+                        helptext=row.get("_help"),
+                        current_value=cur_val,
                     )
                     globals_vals["township"] = "" if sel == "— select —" else sel
-        
-                else:
-                    # All other globals use your existing generic renderer
-                    globals_vals[name] = render_field(row, key_prefix="global", current_value=None)
-
-        # Per-calculator inputs (hiding duplicates of globals)
-        for c in calculators:
-            if c["id"] not in selected:
-                continue
-            st.subheader(f"{_display_name(c['id'], schema)} — Inputs")
-            rows = [r for r in (c.get("inputs") or []) if r["Name"] not in global_names]
-            if not rows:
-                st.caption("No inputs for this calculator.")
-            else:
-                icols = st.columns(2)
-                for i, row in enumerate(rows):
-                    with icols[i % 2]:
-                        val = st.session_state.get(f"calc:{c['id']}:{row['Name']}")
-                        _ = render_field(row, key_prefix=f"calc:{c['id']}", current_value=val)
 
-        # Build payload on the left
+        # All remaining inputs live in one form: widget changes are batched on
+        # the frontend and the script reruns only on submit, not per keystroke.
         overrides: Dict[str, Dict[str, Any]] = {}
-        for c in calculators:
-            if c["id"] not in selected:
-                continue
-            per = {}
-            for row in (c.get("inputs") or []):
-                nm = row["Name"]
-                if nm in global_names:
+        with st.form("calc_form", clear_on_submit=False):
+            if other_global_rows:
+                fcols = st.columns(2)
+                for i, row in enumerate(other_global_rows):
+                    with fcols[i % 2]:
+                        globals_vals[row["Name"]] = render_field(row, key_prefix="global", current_value=None,
+                                                                 county_maps=county_maps)
+
+            # Per-calculator inputs (hiding duplicates of globals)
+            # One snapshot instead of a SessionStateProxy lookup per field: the
+            # calc:* keys read below were written on earlier reruns, so a plain
+            # dict copy taken here is safe and much cheaper per access.
+            ss = dict(st.session_state)
+            for c in calculators:
+                cid = c["id"]
+                if cid not in selected_set:
                     continue
-                key = f"calc:{c['id']}:{nm}"
-                if key in st.session_state:
-                    per[nm] = st.session_state[key]
-            if per:
-                overrides[c["id"]] = per
-
-        payload = {
-            "selected_calculators": selected,
-            "globals": globals_vals,
-            "overrides": overrides
-        }
-
-        st.divider()
-        c1, c2, c3 = st.columns([1, 1, 1])
-        with c1:
-            if st.button("Calculate", type="primary", use_container_width=True):
+                st.subheader(f"{_display_name(cid, schema)} — Inputs")
+                info = calc_index[cid]
+                rows = info["rows"]
+                if not rows:
+                    st.caption("No inputs for this calculator.")
+                    continue
+                per = {}
+                icols = st.columns(2)
+                for i, (row, wkey) in enumerate(zip(rows, info["keys"])):
+                    with icols[i % 2]:
+                        per[row["Name"]] = render_field(row, key_prefix=f"calc:{cid}",
+                                                        current_value=ss.get(wkey),
+                                                        county_maps=county_maps, widget_key=wkey)
+                if per:
+                    overrides[cid] = per
+
+            submitted = st.form_submit_button("Calculate", type="primary", use_container_width=True)
+
+        # Assemble the payload only on reruns that actually consume it (a
+        # submit, or the preview below); every other rerun skips the build.
+        def _build_payload():
+            return {
+                "selected_calculators": selected,
+                "globals": globals_vals,
+                "overrides": overrides
+            }
+
+        if submitted:
+            payload = _build_payload()
+            body = orjson.dumps(payload)
+            payload_hash = hashlib.blake2b(body, digest_size=16).hexdigest()
+            # Same inputs as the results we already have: skip the round-trip.
+            if (payload_hash == st.session_state.get("last_payload_hash")
+                    and st.session_state.get("last_results")):
+                st.info("Inputs unchanged — showing existing results.")
+            else:
                 try:
-                    r = requests.post(f"{API_BASE}/calculate", headers=HEADERS,
-                                      data=json.dumps(payload), timeout=120)
+                    r = _SESSION.post(f"{API_BASE}/calculate", data=body, timeout=120)
                     if not r.ok:
                         st.error(f"API error {r.status_code}: {r.text}")
                     else:
-                        data = r.json()
+                        data = orjson.loads(r.content)
                         st.session_state["last_results"] = data.get("results", data)
+                        st.session_state["last_payload_hash"] = payload_hash
+                        st.session_state.pop("result_dfs", None)  # rebuilt from new results
                 except Exception as e:
                     st.error(f"Request failed: {e}")
+
+        st.divider()
+        c2, c3 = st.columns([1, 1])
         with c2:
-            with st.expander("Payload Preview", expanded=False):
-                st.code(json.dumps(payload, indent=2))
+            # Only serialize when the user actually asks for the preview;
+            # a collapsed expander still executes its body on every rerun.
+            if st.checkbox("Show payload preview", key="show_payload"):
+                with st.expander("Payload Preview", expanded=True):
+                    st.code(orjson.dumps(_build_payload(), option=orjson.OPT_INDENT_2).decode())
         with c3:
             if st.button("Reset to Default Values", key="btn_reset_defaults", use_container_width=True):
                 # 1) Clear any old widget/preview/download keys
                 _safe_clear_state(("global:", "calc:", "pv:", "dl:"))
-                
+
                 # 1b) Seed county/township with the placeholder so selectboxes always serialize
                 st.session_state["global:county"] = "— select —"
                 st.session_state["global:township"] = "— select —"
@@ -662,14 +851,13 @@ def main():
                     st.session_state[f"global:{name}"] = _normalize_default_for_row(row, schema_lists)
                 
                 # 3) Re-apply typed defaults for each calculator input (skipping globals duplicated in modules)
-                for c in calculators:
-                    for row in (c.get("inputs") or []):
-                        name = row.get("Name")
-                        if name in global_names:
-                            continue
-                        st.session_state[f"calc:{c['id']}:{name}"] = _normalize_default_for_row(row, schema_lists)
+                for info in calc_index.values():
+                    for row, wkey in zip(info["rows"], info["keys"]):
+                        st.session_state[wkey] = _normalize_default_for_row(row, schema_lists)
                 
                 st.session_state.pop("last_results", None)
+                st.session_state.pop("last_payload_hash", None)
+                st.session_state.pop("result_dfs", None)
                 st.success("All inputs reset to default values.")
                 st.rerun()
 
@@ -683,18 +871,20 @@ def main():
         else:
             for cid, block in results.items():
                 st.subheader(_display_name(cid,schema))
+                info = calc_index.get(cid)
+                cid_labels = info["labels"] if info else {}
                 scalars, arrays = [], []
                 for name, val in (block or {}).items():
                     if _is_array_like(val):
                         arrays.append((name, val))
                     else:
                         v_scalar = _extract_scalar_value(val)
-                        label = label_map.get(cid, {}).get(name, name)
+                        label = cid_labels.get(name, name)
                         scalars.append({"Metric": label, "Value": v_scalar})
                 
                 if scalars:
                     df = pd.DataFrame(scalars)
-                    df["Value"] = df["Value"].map(format_number)
+                    df["Value"] = _format_series(df["Value"])
                     st.dataframe(df, use_container_width=True)
 
                 # carve out for ranged values
@@ -702,19 +892,26 @@ def main():
                     "DecommissioningOnlyMW": {"inputs", "outputs"}  # show full tables for these
                 }
                 
+                # DataFrames are rebuilt only when a new result set arrives;
+                # in between, reruns reuse the ones cached here.
+                df_cache = st.session_state.setdefault("result_dfs", {})
                 for name, v in arrays:
-                    header = label_map.get(cid, {}).get(name, v.get("label") or name)
-                    df, _ = _as_array_df(v)
+                    header = cid_labels.get(name, v.get("label") or name)
+                    df = df_cache.get((cid, name))
+                    if df is None:
+                        df, _ = _as_array_df(v)
+                        if df is not None:
+                            df_cache[(cid, name)] = df
                     if df is None:
                         st.warning(f"{header}: table not available.")
                         continue
                 
                     if cid in ALWAYS_SHOW and (not ALWAYS_SHOW[cid] or name in ALWAYS_SHOW[cid]):
                         st.caption(header)
-                        st.dataframe(df.applymap(format_number), use_container_width=True)
+                        _show_table(df)
                     else:
                         # CSV (raw numeric, no formatting)
-                        csv_bytes = df.to_csv(index=False).encode("utf-8")
+                        csv_bytes = _csv_bytes(df)
                         st.caption(header)
                         st.download_button(
                             label="Download annualized data (CSV)",
@@ -729,8 +926,7 @@ def main():
                         if st.checkbox("Preview annualized data", key=preview_key):
                             with st.expander(f"{header} — preview", expanded=True):
                                 max_rows = 6
-                                df_preview = df.head(max_rows).applymap(format_number)
-                                st.dataframe(df_preview, use_container_width=True)
+                                _show_table(df.head(max_rows))
 
 if __name__ == "__main__":
     main()